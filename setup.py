@@ -15,14 +15,21 @@ setuptools.setup(
     url="https://github.com/janrothkegel/wolf-comm",
     include_package_data=True,
     packages=setuptools.find_packages(),
+    python_requires='>=3.10',
     classifiers=[
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",
     ],
     install_requires=[
-        'httpx',
+        'httpx[http2]',
+        'ijson',
         'lxml',
+        'msgspec',
+        'orjson',
         'pkce',
         'shortuuid'
-    ]
+    ],
+    extras_require={
+        'msgpack': ['msgpack']
+    }
 )
@@ -77,3 +77,7 @@ SYSTEM_LIST = 'SystemList'
 GATEWAY_STATE = 'GatewayState'
 
 IS_ONLINE = 'IsOnline'
+
+JSON_CONTENT_TYPE = 'application/json'
+
+MSGPACK_CONTENT_TYPE = 'application/x-msgpack'
@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
+from typing import Any
+
+import msgspec
+
+from wolf_comm.constants import VALUE_ID, VALUE, STATE
 
 
 class Device:
+    __slots__ = ('id', 'gateway', 'name')
 
     def __init__(self, device_id: int, gateway: int, name: str):
         self.id = device_id
@@ -211,6 +217,8 @@ class PercentageParameter(UnitParameter):
 
 
 class ListItem:
+    __slots__ = ('name', 'value')
+
     name: str
     value: int
 
@@ -255,12 +263,11 @@ class ListItemParameter(Parameter):
         return super().__str__() + " items: " + ", ".join([item.__str__() for item in self.items])
 
 
-class Value:
-
-    def __init__(self, value_id: int, value: str, state: str):
-        self.value_id = value_id
-        self.value = value
-        self.state = state
+class Value(msgspec.Struct, frozen=True, rename={"value_id": VALUE_ID, "value": VALUE, "state": STATE}):
+    value_id: int
+    # UNSET when the portal did not report a value for this id
+    value: Any = msgspec.UNSET
+    state: Any = None
 
     def __str__(self) -> str:
         return 'Value id: {}, value: {}, state {}'.format(self.value_id, self.value, self.state)
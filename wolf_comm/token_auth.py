@@ -1,5 +1,6 @@
 import datetime
 import logging
+import time
 
 from httpx import AsyncClient
 
@@ -20,9 +21,11 @@ class Tokens:
     def __init__(self, access_token: str, expires_in: int):
         self.access_token = access_token
         self.expire_date = datetime.datetime.now() + datetime.timedelta(seconds=expires_in)
+        # Monotonic deadline used for the expiry check, unaffected by wall clock changes
+        self._expires_at = time.monotonic() + expires_in
 
     def is_expired(self) -> bool:
-        return self.expire_date < datetime.datetime.now()
+        return self._expires_at < time.monotonic()
 
 
 class TokenAuth:
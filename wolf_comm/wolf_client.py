@@ -1,14 +1,23 @@
-import datetime
-from typing import Union
+import asyncio
+import random
+import time
+from contextlib import aclosing
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Union
 
 import httpx
+import ijson
 import logging
+import msgspec
+import orjson
 from httpx import Headers
 
 from wolf_comm.constants import BASE_URL_PORTAL, ID, GATEWAY_ID, NAME, SYSTEM_ID, MENU_ITEMS, TAB_VIEWS, BUNDLE_ID, \
-    BUNDLE, VALUE_ID_LIST, GUI_ID_CHANGED, SESSION_ID, VALUE_ID, VALUE, STATE, VALUES, PARAMETER_ID, UNIT, \
+    BUNDLE, VALUE_ID_LIST, GUI_ID_CHANGED, SESSION_ID, VALUE_ID, VALUE, VALUES, PARAMETER_ID, UNIT, \
     CELSIUS_TEMPERATURE, BAR, PERCENTAGE, LIST_ITEMS, DISPLAY_TEXT, PARAMETER_DESCRIPTORS, TAB_NAME, HOUR, \
-    LAST_ACCESS, ERROR_CODE, ERROR_TYPE, ERROR_MESSAGE, ERROR_READ_PARAMETER, SYSTEM_LIST, GATEWAY_STATE, IS_ONLINE
+    LAST_ACCESS, ERROR_CODE, ERROR_TYPE, ERROR_MESSAGE, ERROR_READ_PARAMETER, SYSTEM_LIST, GATEWAY_STATE, IS_ONLINE, \
+    JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE
 from wolf_comm.create_session import create_session, update_session
 from wolf_comm.helpers import bearer_header
 from wolf_comm.models import Temperature, Parameter, SimpleParameter, Device, Pressure, ListItemParameter, \
@@ -17,80 +26,398 @@ from wolf_comm.token_auth import Tokens, TokenAuth
 
 _LOGGER = logging.getLogger(__name__)
 
+PARAMETERS_CACHE_TTL = 3600
+
+MAX_REQUEST_ATTEMPTS = 3
+
+RETRY_BACKOFF = 0.2
+
+_CONTENT_TYPE_HEADERS = {
+    JSON_CONTENT_TYPE: Headers({"Content-Type": JSON_CONTENT_TYPE}),
+    MSGPACK_CONTENT_TYPE: Headers({"Content-Type": MSGPACK_CONTENT_TYPE})
+}
+
+# Constant part of the GetParameterValues body; the dynamic fields are appended per request
+_VALUES_BODY_STATIC = {BUNDLE_ID: 1000, BUNDLE: False, GUI_ID_CHANGED: False}
+_VALUES_BODY_PREFIX = orjson.dumps(_VALUES_BODY_STATIC)[:-1] + b','
+
+_UNIT_TO_CLASS = {
+    CELSIUS_TEMPERATURE: Temperature,
+    BAR: Pressure,
+    PERCENTAGE: PercentageParameter,
+    HOUR: HoursParameter
+}
+
+
+class _ValuesResponse(msgspec.Struct, rename={"values": VALUES, "last_access": LAST_ACCESS,
+                                               "error_code": ERROR_CODE, "error_type": ERROR_TYPE,
+                                               "message": ERROR_MESSAGE}):
+    values: list[Value] = []
+    last_access: Any = None
+    error_code: Any = msgspec.UNSET
+    error_type: Any = msgspec.UNSET
+    message: Any = msgspec.UNSET
+
+    def error(self) -> dict:
+        """Error fields the portal sent, keyed by their portal names"""
+        fields = {ERROR_CODE: self.error_code, ERROR_TYPE: self.error_type, ERROR_MESSAGE: self.message}
+        return {key: value for key, value in fields.items() if value is not msgspec.UNSET}
+
+
+@lru_cache
+def _decoders(response_type: type) -> (msgspec.json.Decoder, msgspec.msgpack.Decoder):
+    return msgspec.json.Decoder(response_type), msgspec.msgpack.Decoder(response_type)
+
+
+class _AsyncByteReader:
+    """Async file-like view over a byte stream, as expected by ijson"""
+
+    def __init__(self, chunks):
+        self._chunks = aiter(chunks)
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to detect the stream type
+        if size == 0:
+            return b''
+        try:
+            return await anext(self._chunks)
+        except StopAsyncIteration:
+            return b''
+
+    async def drain(self):
+        async for _ in self._chunks:
+            pass
+
+
+class _ValueRequest:
+
+    def __init__(self, gateway_id, system_id, value_ids: [int], future: asyncio.Future):
+        self.gateway_id = gateway_id
+        self.system_id = system_id
+        self.value_ids = value_ids
+        self.future = future
+
+
+class _ValueBatcher:
+    """Coalesces concurrent value fetches into one GetParameterValues request per gateway/system"""
+
+    def __init__(self, send, max_batch: int = 64, max_wait: float = 0.01):
+        self._send = send
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._queue = None
+        self._worker = None
+        self._dispatches = set()
+
+    async def submit(self, gateway_id, system_id, value_ids: [int]) -> [Value]:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_ValueRequest(gateway_id, system_id, value_ids, future))
+        return await future
+
+    async def close(self):
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            self._queue.get_nowait().future.cancel()
+        self._worker = None
+        for dispatch in self._dispatches:
+            dispatch.cancel()
+        await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0].value_ids)
+            deadline = loop.time() + self._max_wait
+            while size < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(request)
+                size += len(request.value_ids)
+
+            groups = {}
+            for request in batch:
+                groups.setdefault((request.gateway_id, request.system_id), []).append(request)
+            # Send in the background so the next batch can be collected while this one is in flight
+            for (gateway_id, system_id), requests in groups.items():
+                dispatch = asyncio.create_task(self._dispatch(gateway_id, system_id, requests))
+                self._dispatches.add(dispatch)
+                dispatch.add_done_callback(self._dispatches.discard)
+            # Stop when idle so no task outlives the caller's use of the client; submit() starts
+            # a new worker. Nothing may be awaited between this check and returning.
+            if self._queue.empty():
+                return
+
+    async def _dispatch(self, gateway_id, system_id, requests: [_ValueRequest]):
+        # Callers cancelled while waiting in the queue are dropped from the batch
+        requests = [request for request in requests if not request.future.done()]
+        if not requests:
+            return
+        value_ids = list(dict.fromkeys(value_id for request in requests for value_id in request.value_ids))
+        try:
+            values = await self._send(gateway_id, system_id, value_ids)
+        except (FetchFailed, ParameterReadError) as e:
+            if len(requests) == 1:
+                if not requests[0].future.done():
+                    requests[0].future.set_exception(e)
+                return
+            # The portal rejected the merged request; send each caller's ids separately so
+            # only the callers whose own request fails get the error
+            await asyncio.gather(*[self._dispatch(gateway_id, system_id, [request]) for request in requests])
+            return
+        except BaseException as e:
+            for request in requests:
+                if not request.future.done():
+                    if isinstance(e, asyncio.CancelledError):
+                        request.future.cancel()
+                    else:
+                        request.future.set_exception(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return
+        for request in requests:
+            if not request.future.done():
+                wanted = set(request.value_ids)
+                request.future.set_result([value for value in values if value.value_id in wanted])
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == 401 or 500 <= status_code < 600
+
 
 class WolfClient:
+    __slots__ = ('_client', '_client_lambda', '_owns_client', '_msgpack', '_prefer_msgpack', 'tokens', 'token_auth',
+                 'session_id', 'last_access', 'last_failed', '_session_refresh_deadline', '_auth_headers', '_params_cache',
+                 '_auth_lock', '_value_batcher')
+
     session_id: int or None
     tokens: Tokens or None
     last_access: datetime or None
     last_failed: bool
-    last_session_refesh: datetime or None
+    _session_refresh_deadline: float
     
     
     @property
     def client(self):
-        if hasattr(self, '_client') and self._client != None:
+        client = self._client
+        if client is not None:
+            return client
+        if self._client_lambda is not None:
+            # Resolve the lambda only once so every request shares one connection pool
+            self._client = self._client_lambda()
             return self._client
-        elif hasattr(self, '_client_lambda') and self._client_lambda != None:
-            return self._client_lambda()
-        else:
-            raise RuntimeError("No valid client configuration")
+        raise RuntimeError("No valid client configuration")
         
 
-    def __init__(self, username: str, password: str, client = None, client_lambda = None):
-        if client != None and client_lambda != None:
+    def __init__(self, username: str, password: str, client = None, client_lambda = None,
+                 prefer_msgpack: bool = False):
+        """Create a client for the Wolf SmartSet portal.
+
+        Reuse one instance for all fetch_* calls (e.g. a polling loop) so the
+        underlying HTTP/2 connection to the portal is kept alive between requests.
+
+        With prefer_msgpack the portal is asked for MessagePack bodies (requires the
+        msgpack extra); the client falls back to JSON when the portal rejects it.
+        """
+        self._client = None
+        self._client_lambda = None
+        self._owns_client = False
+        self._msgpack = None
+        self._prefer_msgpack = prefer_msgpack
+        if prefer_msgpack:
+            import msgpack
+            self._msgpack = msgpack
+        if client is not None and client_lambda is not None:
             raise RuntimeError("Only one of client and client_lambda is allowed!")
-        elif client != None:
+        elif client is not None:
             self._client = client
-        elif client_lambda != None:
+        elif client_lambda is not None:
             self._client_lambda = client_lambda
         else:
-            self._client = httpx.AsyncClient()
+            self._client = httpx.AsyncClient(http2=True, timeout=30.0, limits=httpx.Limits(
+                max_connections=100, max_keepalive_connections=20, keepalive_expiry=60))
+            self._owns_client = True
         
         self.tokens = None
         self.token_auth = TokenAuth(username, password)
         self.session_id = None
         self.last_access = None
         self.last_failed = False
-        self.last_session_refesh = None
+        self._session_refresh_deadline = 0.0
+        self._auth_headers = None
+        self._params_cache = {}
+        self._auth_lock = asyncio.Lock()
+        self._value_batcher = _ValueBatcher(self.__fetch_values)
 
-    async def __request(self, method: str, path: str, **kwargs) -> Union[dict, list]:
-        if self.tokens is None or self.tokens.is_expired():
-            await self.__authorize_and_session()
+    async def close(self):
+        """Close the underlying HTTP client if it was created by this instance."""
+        await self._value_batcher.close()
+        if self._owns_client:
+            await self._client.aclose()
 
-        headers = kwargs.get('headers')
+    async def __aenter__(self):
+        return self
 
-        if headers is None:
-            headers = bearer_header(self.tokens.access_token)
-        else:
-            headers = {**bearer_header(self.tokens.access_token), **dict(headers)}
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
 
-        if self.last_session_refesh is None or self.last_session_refesh <= datetime.datetime.now():
-            await update_session(self.client, self.tokens.access_token, self.session_id)
-            self.last_session_refesh = datetime.datetime.now() + datetime.timedelta(seconds=60)
-            _LOGGER.debug('Sessionid: %s extented', self.session_id)
-        
-        resp = await self.__execute(headers, kwargs, method, path)
-        if resp.status_code == 401 or resp.status_code == 500:
-            _LOGGER.info('Retrying failed request (status code %d)',
-                         resp.status_code)
-            await self.__authorize_and_session()
-            headers = {**bearer_header(self.tokens.access_token), **dict(headers)}
-            try:
-                execution = await self.__execute(headers, kwargs, method, path)
-                return execution.json()
-            except FetchFailed as e:
-                self.last_failed = True
-                raise e
+    async def __request(self, method: str, path: str, payload=None, response_type: type = None,
+                        **kwargs) -> Union[dict, list, msgspec.Struct]:
+        tokens = await self.__ensure_authorized()
+
+        url = f"{BASE_URL_PORTAL}/{path}"
+        caller_headers = extra_headers = kwargs.get('headers')
+        negotiated_msgpack = self._prefer_msgpack
+        if payload is not None:
+            content, content_type = self.__encode(payload)
+            kwargs['content'] = content
+            if extra_headers is None:
+                extra_headers = _CONTENT_TYPE_HEADERS[content_type]
+            else:
+                extra_headers = {**dict(extra_headers), "Content-Type": content_type}
+        kwargs['headers'] = self.__headers(extra_headers)
+
+        extension = self.__extend_session()
+        if extension is not None:
+            # Extend the session alongside the actual request instead of before it
+            resp, _ = await asyncio.gather(self.__execute(url, method, kwargs), extension)
         else:
-            self.last_failed = False
-            return resp.json()
+            resp = await self.__execute(url, method, kwargs)
+        if negotiated_msgpack and resp.status_code in (406, 415):
+            if self._prefer_msgpack:
+                _LOGGER.info('MessagePack rejected (status code %d), falling back to JSON', resp.status_code)
+                self._prefer_msgpack = False
+                self.__update_auth_headers()
+            kwargs['headers'] = caller_headers
+            return await self.__request(method, path, payload, response_type, **kwargs)
+        for attempt in range(1, MAX_REQUEST_ATTEMPTS):
+            if not _is_retryable(resp.status_code):
+                break
+            tokens = await self.__prepare_retry(resp.status_code, attempt, tokens)
+            kwargs['headers'] = self.__headers(extra_headers)
+            resp = await self.__execute(url, method, kwargs)
+        self.last_failed = _is_retryable(resp.status_code)
+        return self.__decode(resp, response_type)
+
+    async def __request_stream(self, method: str, path: str, prefix: str, **kwargs):
+        """Yield the JSON items found under prefix while the response body is still being received."""
+        tokens = await self.__ensure_authorized()
+
+        url = f"{BASE_URL_PORTAL}/{path}"
+        extra_headers = {**dict(kwargs.get('headers') or {}), "Accept": JSON_CONTENT_TYPE}
+        kwargs['headers'] = self.__headers(extra_headers)
+
+        extension = self.__extend_session()
+        extension_task = asyncio.ensure_future(extension) if extension is not None else None
+        try:
+            for attempt in range(1, MAX_REQUEST_ATTEMPTS + 1):
+                async with self.client.stream(method, url, **kwargs) as resp:
+                    status_code = resp.status_code
+                    if attempt == MAX_REQUEST_ATTEMPTS or not _is_retryable(status_code):
+                        self.last_failed = _is_retryable(status_code)
+                        reader = _AsyncByteReader(resp.aiter_bytes())
+                        try:
+                            async for item in ijson.items(reader, prefix, use_float=True):
+                                yield item
+                        except GeneratorExit:
+                            # Receive the rest of the body unparsed so the connection can be reused
+                            await reader.drain()
+                            raise
+                        return
+                tokens = await self.__prepare_retry(status_code, attempt, tokens)
+                kwargs['headers'] = self.__headers(extra_headers)
+        finally:
+            if extension_task is not None:
+                await extension_task
+
+    async def __prepare_retry(self, status_code: int, attempt: int, tokens: Tokens) -> Tokens:
+        """Back off on server errors and reauthorize when the portal rejected the session."""
+        _LOGGER.info('Retrying failed request (status code %d, attempt %d)', status_code, attempt)
+        if status_code >= 500:
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1) + random.random() * 0.1)
+        # The portal answers 500 as well when the session is no longer valid
+        if status_code == 401 or status_code == 500:
+            tokens = await self.__reauthorize(tokens)
+        return tokens
+
+    def __extend_session(self):
+        """Return an UpdateSession call when the session is due to be extended, otherwise None."""
+        now = time.monotonic()
+        if now < self._session_refresh_deadline:
+            return None
+        self._session_refresh_deadline = now + 60.0
+        _LOGGER.debug('Sessionid: %s extented', self.session_id)
+        return update_session(self.client, self.tokens.access_token, self.session_id)
 
-    async def __execute(self, headers, kwargs, method, path):
-        return await self.client.request(method, f"{BASE_URL_PORTAL}/{path}", **dict(kwargs, headers=Headers(headers)))
+    def __headers(self, extra_headers) -> Headers:
+        if extra_headers is None:
+            return self._auth_headers
+        headers = self._auth_headers.copy()
+        headers.update(extra_headers)
+        return headers
+
+    def __update_auth_headers(self):
+        self._auth_headers = self.__build_auth_headers(self.tokens.access_token)
+
+    def __build_auth_headers(self, access_token: str) -> Headers:
+        headers = Headers(bearer_header(access_token))
+        if self._prefer_msgpack:
+            headers["Accept"] = MSGPACK_CONTENT_TYPE + ", " + JSON_CONTENT_TYPE + ";q=0.5"
+        return headers
+
+    def __encode(self, payload) -> (bytes, str):
+        if self._prefer_msgpack:
+            return self._msgpack.packb(payload), MSGPACK_CONTENT_TYPE
+        return orjson.dumps(payload), JSON_CONTENT_TYPE
+
+    def __decode(self, resp: httpx.Response, response_type: type = None) -> Union[dict, list, msgspec.Struct]:
+        is_msgpack = resp.headers.get("Content-Type", "").startswith(MSGPACK_CONTENT_TYPE)
+        if response_type is not None:
+            json_decoder, msgpack_decoder = _decoders(response_type)
+            return (msgpack_decoder if is_msgpack else json_decoder).decode(resp.content)
+        if is_msgpack:
+            return self._msgpack.unpackb(resp.content, raw=False)
+        return orjson.loads(resp.content)
+
+    async def __execute(self, url: str, method: str, kwargs: dict) -> httpx.Response:
+        return await self.client.request(method, url, **kwargs)
+
+    async def __ensure_authorized(self) -> Tokens:
+        if self.tokens is None or self.tokens.is_expired():
+            async with self._auth_lock:
+                # Another request may have authorized while we were waiting for the lock
+                if self.tokens is None or self.tokens.is_expired():
+                    await self.__authorize_and_session()
+        return self.tokens
+
+    async def __reauthorize(self, rejected_tokens: Tokens) -> Tokens:
+        """Authorize again after the portal rejected rejected_tokens, unless another request already did."""
+        async with self._auth_lock:
+            if self.tokens is rejected_tokens:
+                await self.__authorize_and_session()
+        return self.tokens
 
     async def __authorize_and_session(self):
-        self.tokens = await self.token_auth.token(self.client)
-        self.session_id = await create_session(self.client, self.tokens.access_token)
+        tokens = await self.token_auth.token(self.client)
+        session_id = await create_session(self.client, tokens.access_token)
+        # Publish everything at once, tokens last: requests skip the auth lock once they see valid tokens
+        self.session_id = session_id
+        self._auth_headers = self.__build_auth_headers(tokens.access_token)
+        self.tokens = tokens
 
     # api/portal/GetSystemList
     async def fetch_system_list(self) -> [Device]:
@@ -101,80 +428,107 @@ class WolfClient:
     # api/portal/GetSystemStateList
     async def fetch_system_state_list(self, system_id, gateway_id) -> bool:
         payload = {SESSION_ID: self.session_id, SYSTEM_LIST: [{SYSTEM_ID: system_id, GATEWAY_ID: gateway_id}]}
-        system_state_response = await self.__request('post', 'api/portal/GetSystemStateList', json=payload)
+        system_state_response = await self.__request('post', 'api/portal/GetSystemStateList', payload)
         _LOGGER.debug('Fetched system state: %s', system_state_response)
         return system_state_response[0][GATEWAY_STATE][IS_ONLINE]
 
 
     # api/portal/GetGuiDescriptionForGateway?GatewayId={gateway_id}&SystemId={system_id}
     async def fetch_parameters(self, gateway_id, system_id) -> [Parameter]:
+        """Fetch parameter descriptions, cached per gateway and system for PARAMETERS_CACHE_TTL seconds."""
+        cached = self._params_cache.get((gateway_id, system_id))
+        if cached is not None and time.monotonic() - cached[0] < PARAMETERS_CACHE_TTL:
+            return list(cached[1])
+
         payload = {GATEWAY_ID: gateway_id, SYSTEM_ID: system_id}
-        desc = await self.__request('get', 'api/portal/GetGuiDescriptionForGateway', params=payload)
-        _LOGGER.debug('Fetched parameters: %s', desc)
-        tab_views = desc[MENU_ITEMS][0][TAB_VIEWS]
+        # Only the first menu item is used, so stop parsing the description once it is complete
+        async with aclosing(self.__request_stream('get', 'api/portal/GetGuiDescriptionForGateway',
+                                                  MENU_ITEMS + '.item', params=payload)) as menu_items:
+            menu_item = await anext(menu_items, None)
+        if menu_item is None:
+            raise FetchFailed('No %s in GUI description for gateway %s, system %s'
+                              % (MENU_ITEMS, gateway_id, system_id))
+        _LOGGER.debug('Fetched parameters: %s', menu_item)
+        tab_views = menu_item[TAB_VIEWS]
         result = [WolfClient._map_view(view) for view in tab_views]
 
-        result.reverse()
-        distinct_ids = []
+        seen_ids = set()
         flattened = []
-        for sublist in result:
-            distinct_names = []
+        for sublist in reversed(result):
+            seen_names = set()
             for val in sublist:
-                if val.value_id not in distinct_ids and val.name not in distinct_names:
-                    distinct_ids.append(val.value_id)
-                    distinct_names.append(val.name)
-                    flattened.append(val)
-        return flattened
+                if val.value_id in seen_ids or val.name in seen_names:
+                    continue
+                seen_ids.add(val.value_id)
+                seen_names.add(val.name)
+                flattened.append(val)
+        self._params_cache[(gateway_id, system_id)] = (time.monotonic(), flattened)
+        return list(flattened)
+
+    def invalidate_parameters(self, gateway_id, system_id):
+        """Drop cached parameter descriptions, e.g. after the portal reports unknown value ids."""
+        self._params_cache.pop((gateway_id, system_id), None)
+
+    async def fetch_all(self, gateway_id, system_id, parameters: [Parameter]) -> (bool, [Value]):
+        """Fetch the online state of the system and the values of the given parameters concurrently."""
+        return tuple(await asyncio.gather(self.fetch_system_state_list(system_id, gateway_id),
+                                          self.fetch_value(gateway_id, system_id, parameters)))
 
     # api/portal/CloseSystem
     async def close_system(self):
         data = {
             SESSION_ID: self.session_id
         }
-        res = await self.__request('post', 'api/portal/CloseSystem', json=data)
+        res = await self.__request('post', 'api/portal/CloseSystem', data)
         _LOGGER.debug('Close system response: %s', res)
 
+    async def fetch_value(self, gateway_id, system_id, parameters: [Parameter]) -> [Value]:
+        """Fetch values of the given parameters.
+
+        Concurrent calls are batched into a single GetParameterValues request. If the
+        portal rejects a merged request, each call is retried on its own, so errors
+        only reach the callers whose parameters caused them.
+        """
+        return await self._value_batcher.submit(gateway_id, system_id, [param.value_id for param in parameters])
+
     # api/portal/GetParameterValues
-    async def fetch_value(self, gateway_id, system_id, parameters: [Parameter]):
+    async def __fetch_values(self, gateway_id, system_id, value_ids: [int]) -> [Value]:
         data = {
-            BUNDLE_ID: 1000,
-            BUNDLE: False,
-            VALUE_ID_LIST: [param.value_id for param in parameters],
+            VALUE_ID_LIST: value_ids,
             GATEWAY_ID: gateway_id,
             SYSTEM_ID: system_id,
-            GUI_ID_CHANGED: False,
             SESSION_ID: self.session_id,
             LAST_ACCESS: self.last_access
         }
-        res = await self.__request('post', 'api/portal/GetParameterValues', json=data,
-                                   headers={"Content-Type": "application/json"})
+        if not self._prefer_msgpack:
+            body = _VALUES_BODY_PREFIX + orjson.dumps(data)[1:]
+            res = await self.__request('post', 'api/portal/GetParameterValues', response_type=_ValuesResponse,
+                                       content=body, headers=_CONTENT_TYPE_HEADERS[JSON_CONTENT_TYPE])
+        else:
+            res = await self.__request('post', 'api/portal/GetParameterValues', {**_VALUES_BODY_STATIC, **data},
+                                       _ValuesResponse)
 
         _LOGGER.debug('Fetched values: %s', res)
 
-        if ERROR_CODE in res or ERROR_TYPE in res:
-            if ERROR_MESSAGE in res and res[ERROR_MESSAGE] == ERROR_READ_PARAMETER:
-                raise ParameterReadError(res)
-            raise FetchFailed(res)
+        if res.error_code is not msgspec.UNSET or res.error_type is not msgspec.UNSET:
+            error = res.error()
+            if res.message == ERROR_READ_PARAMETER:
+                raise ParameterReadError(error)
+            raise FetchFailed(error)
 
-        self.last_access = res[LAST_ACCESS]
-        return [Value(v[VALUE_ID], v[VALUE], v[STATE]) for v in res[VALUES] if VALUE in v]
+        self.last_access = res.last_access
+        return [v for v in res.values if v.value is not msgspec.UNSET]
 
     @staticmethod
-    def _map_parameter(parameter: dict, parent: str) -> Parameter:
+    def _map_parameter(parameter: dict, parent: str, unit_override: str = None) -> Parameter:
         value_id = parameter[VALUE_ID]
         name = parameter[NAME]
         parameter_id = parameter[PARAMETER_ID]
-        if UNIT in parameter:
-            unit = parameter[UNIT]
-            if unit == CELSIUS_TEMPERATURE:
-                return Temperature(value_id, name, parent, parameter_id)
-            elif unit == BAR:
-                return Pressure(value_id, name, parent, parameter_id)
-            elif unit == PERCENTAGE:
-                return PercentageParameter(value_id, name, parent, parameter_id)
-            elif unit == HOUR:
-                return HoursParameter(value_id, name, parent, parameter_id)
-        elif LIST_ITEMS in parameter:
+        unit = unit_override if unit_override is not None else parameter.get(UNIT)
+        if unit is not None:
+            cls = _UNIT_TO_CLASS.get(unit, SimpleParameter)
+            return cls(value_id, name, parent, parameter_id)
+        if LIST_ITEMS in parameter:
             items = [ListItem(list_item[VALUE], list_item[DISPLAY_TEXT]) for list_item in parameter[LIST_ITEMS]]
             return ListItemParameter(value_id, name, parent, items, parameter_id)
         return SimpleParameter(value_id, name, parent, parameter_id)
@@ -182,15 +536,10 @@ class WolfClient:
     @staticmethod
     def _map_view(view: dict):
         if 'SVGHeatingSchemaConfigDevices' in view:
-            units = dict([(unit['valueId'], unit['unit']) for unit
-                          in view['SVGHeatingSchemaConfigDevices'][0]['parameters'] if 'unit' in unit])
-
-            new_params = []
-            for param in view[PARAMETER_DESCRIPTORS]:
-                if param[VALUE_ID] in units:
-                    param[UNIT] = units[param[VALUE_ID]]
-                new_params.append(WolfClient._map_parameter(param, view[TAB_NAME]))
-            return new_params
+            units = {unit['valueId']: unit['unit'] for unit
+                     in view['SVGHeatingSchemaConfigDevices'][0]['parameters'] if 'unit' in unit}
+            return [WolfClient._map_parameter(p, view[TAB_NAME], units.get(p[VALUE_ID]))
+                    for p in view[PARAMETER_DESCRIPTORS]]
         else:
             return [WolfClient._map_parameter(p, view[TAB_NAME]) for p in view[PARAMETER_DESCRIPTORS]]
 